@@ -1,74 +1,594 @@
+import ast
 import logging
 import traceback
 import subprocess
 import tempfile
 import os
-from typing import Dict, Any, Optional
+import io
+import locale
+import contextlib
+import math
+import sys
+import signal
+import threading
+import functools
+import itertools
+import multiprocessing
+import hashlib
+import copy
+from collections import OrderedDict
+import time
+from array import array
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Any, List, Optional
 import re
 
 logger = logging.getLogger("ASI-GO.Engineer")
 
+# Patterns used on every solution/output, compiled once
+_FENCED_PY = re.compile(r'```python\n(.*?)```', re.DOTALL)
+_FENCED_ANY = re.compile(r'```\n(.*?)```', re.DOTALL)
+_FUNC_DEF = re.compile(r'def\s+(\w+)\s*\([^)]*\):')
+# ASCII digits only, matching _scan_ints' byte table so int() never sees
+# a non-ASCII digit and both tokenizer paths agree
+_INTS = re.compile(r'-?\d+', re.ASCII)
+_UINTS = re.compile(r'\d+', re.ASCII)
+
+# Line prefixes that start a code region, and those that keep it going,
+# for solutions without a fenced block
+_CODE_STARTS = ("import ", "from ", "def ", "class ")
+_PROSE_STARTS = ("#", "import", "from", "def", "class", "if", "for", "while",
+                 "return", "print", "try", "except", "elif", "else")
+
+# Function-name fragments that suggest a program's entry point
+_MAIN_KEYWORDS = ("main", "find", "get", "calculate", "solve")
+
+
+@functools.lru_cache(maxsize=128)
+def _first_n_primes(n: int) -> List[int]:
+    """Return the first n primes using a sieve of Eratosthenes (cached; don't mutate)"""
+    if n <= 0:
+        return []
+    
+    # Rosser's bound p_n < n(ln n + ln ln n) only holds for n >= 6
+    if n < 6:
+        limit = 13
+    else:
+        limit = int(n * (math.log(n) + math.log(math.log(n)))) + 1
+    
+    # Odd-only strided slice assignment keeps the inner loop in C
+    mask = bytearray([1]) * (limit + 1)
+    mask[:2] = b"\x00\x00"
+    mask[4::2] = bytes(len(range(4, limit + 1, 2)))
+    for p in range(3, math.isqrt(limit) + 1, 2):
+        if mask[p]:
+            mask[p * p::2 * p] = bytes(len(range(p * p, limit + 1, 2 * p)))
+    
+    # compress/islice pick out the set indices in C and stop after n
+    return list(itertools.islice(itertools.compress(range(limit + 1), mask), n))
+
+
+# Common goals ("first 40 primes", "first 100 primes") are served by slicing
+_PRIME_TABLE = _first_n_primes(10_000)
+_PRIME_TOKENS = [str(p).encode() for p in _PRIME_TABLE]
+
+# Byte table for _scan_ints: ASCII digits stay, every other byte becomes a separator
+_DIGITS_ONLY = bytes(c if 48 <= c <= 57 else 32 for c in range(256))
+
+
+def _scan_ints(output: str, signed: bool = True) -> List[bytes]:
+    """Integer tokens of output as ASCII bytes (b"17"), left unconverted.
+    translate+split runs entirely in C, several times faster than
+    re.findall on outputs listing many thousands of numbers."""
+    if signed and "-" in output:
+        # Keep minus signs attached to their numbers
+        return [token.encode() for token in _INTS.findall(output)]
+    return output.encode().translate(_DIGITS_ONLY).split()
+
+# Primes the fallback heuristic expects among the first ten numbers
+_FIRST_5_PRIMES = frozenset((2, 3, 5, 7, 11))
+
+# Accepted openings of a Fibonacci output, with and without the leading 0
+_FIB5A = (0, 1, 1, 2, 3)
+_FIB5B = (1, 1, 2, 3, 5)
+
+# Successful results Engineer.test_solution remembers for duplicate proposals
+_CACHE_SIZE = 512
+
+# Seconds a candidate may run before it is killed
+_EXEC_TIMEOUT = 30
+
+# Candidates importing any of these touch the network, other processes or
+# the host, so they get a throwaway interpreter started with -I -S instead of
+# a pool worker, which would inherit this process's environment and open
+# descriptors. This only routes code; it is not a sandbox.
+_DENIED_MODULES = ("socket", "urllib", "http", "subprocess", "multiprocessing", "ctypes", "os", "shutil")
+_DENIED_IMPORT = re.compile(
+    r"^\s*(?:import|from)\s+[^\n]*\b(?:" + "|".join(_DENIED_MODULES) + r")\b", re.MULTILINE
+)
+
+class _CandidateTimeout(BaseException):
+    """Raised when a candidate exceeds its time limit (a BaseException so
+    `except Exception` in the candidate can't swallow it)"""
+
+
+def _raise_timeout():
+    raise _CandidateTimeout()
+
+
+# Most a candidate may write to stdout (or stderr) before it is stopped;
+# the rest would only be buffered to be thrown away. Bytes for subprocess
+# output, characters for output captured in a worker.
+_MAX_OUT = 1 << 20
+
+
+class _OutputLimit(BaseException):
+    """A candidate wrote more than _MAX_OUT; args[0] is the stdout captured so far
+    (a BaseException so `except Exception` in the candidate can't swallow it)"""
+
+
+class _CappedIO(io.StringIO):
+    """Capture sink that keeps the first _MAX_OUT characters, then raises _OutputLimit"""
+    
+    def write(self, s: str) -> int:
+        room = _MAX_OUT - self.tell()
+        if len(s) > room:
+            super().write(s[:max(room, 0)])
+            raise _OutputLimit()
+        return super().write(s)
+
+
+def _exec_captured(code: str, namespace: Dict[str, Any]) -> tuple:
+    """Execute candidate source in namespace; returns (stdout, stderr, returncode)"""
+    stdout, stderr = _CappedIO(), _CappedIO()
+    returncode = 0
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                exec(compile(code, "<candidate>", "exec"), namespace)
+            except (_CandidateTimeout, _OutputLimit):
+                raise
+            except SystemExit as e:
+                # Mirror the interpreter: None/0 is success, a message means exit 1
+                if e.code is None or isinstance(e.code, int):
+                    returncode = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    returncode = 1
+            except BaseException as e:
+                # Drop this frame so the traceback starts in the candidate
+                traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+                returncode = 1
+    except _OutputLimit:
+        # Raised by either sink, possibly while printing the traceback
+        raise _OutputLimit(stdout.getvalue()) from None
+    return stdout.getvalue(), stderr.getvalue(), returncode
+
+
+# test_solutions workers set _started[i] when they pick up proposal i, so
+# the parent can tell a task that was running when the pool broke from one
+# that never started
+_started = None
+
+
+def _warm_worker(started=None) -> None:
+    """Pool initializer: import what candidate programs commonly need up front"""
+    global _started
+    _started = started
+    import collections, heapq, itertools, math  # noqa: F401
+
+
+def _run_user_code(code: str) -> tuple:
+    """Pool task: execute candidate source as __main__"""
+    return _exec_captured(code, {"__name__": "__main__"})
+
+
+# One task per worker: a candidate can rebind math.pi or call
+# sys.setrecursionlimit, and that must not leak into the next candidate.
+# max_tasks_per_child needs 3.11+ and rules out the fork start method; a
+# forkserver that has already imported this module keeps each fresh
+# worker down to a fork (about 10 ms) rather than a full interpreter start.
+_FRESH_WORKERS = sys.version_info >= (3, 11)
+
+
+@functools.lru_cache(maxsize=None)
+def _pool_options() -> Dict[str, Any]:
+    """ProcessPoolExecutor options for one task per worker. Built on first
+    use, not at import, because it sets the process-wide forkserver preload."""
+    if not _FRESH_WORKERS:
+        return {}
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        if __name__ != "__main__":
+            context.set_forkserver_preload([__name__])
+    else:
+        context = multiprocessing.get_context("spawn")
+    return {"mp_context": context, "max_tasks_per_child": 1}
+
+
+def _new_pool(workers: int, started=None) -> ProcessPoolExecutor:
+    """Process pool for candidates, one task per worker where supported;
+    started is an optional _new_flags() array for _run_candidate"""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker,
+                               initargs=(started,), **_pool_options())
+
+
+def _new_flags(n: int):
+    """n zeroed bytes shared with workers of the pools from _new_pool"""
+    context = _pool_options().get("mp_context") or multiprocessing.get_context()
+    return context.RawArray('b', n)
+
+
+def _terminate_workers(executor: ProcessPoolExecutor) -> None:
+    """Kill an executor's worker processes.
+    
+    shutdown() only waits for running tasks, and there is no public way to
+    stop a worker stuck in a candidate, so this reaches into the private
+    _processes mapping (pid -> Process; None once the executor is shut down).
+    """
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+
+
+# Shared by test_solution runs; created on first use so that importing this
+# module (as every pool worker does) doesn't build a pool of its own
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """The shared candidate pool, started on first call"""
+    global _POOL
+    if _POOL is None:
+        _POOL = _new_pool(2)
+    return _POOL
+
+
+def _replace_pool() -> None:
+    """Kill the current workers (e.g. one stuck in a candidate); the next
+    _get_pool() starts a new pool"""
+    global _POOL
+    if _POOL is not None:
+        _terminate_workers(_POOL)
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def _run_pooled(code: str, timeout: float) -> tuple:
+    """Run candidate code in a pooled worker"""
+    try:
+        outcome = _get_pool().submit(_run_user_code, code).result(timeout=timeout)
+        if not _FRESH_WORKERS:
+            # No max_tasks_per_child before 3.11: retire the worker by hand
+            _replace_pool()
+        return outcome
+    except FuturesTimeoutError:
+        # The worker is still busy with the candidate, so it can't be reused
+        _replace_pool()
+        raise _CandidateTimeout()
+    except BrokenProcessPool:
+        # The candidate took its worker down (os._exit, crash in C code, ...)
+        _replace_pool()
+        raise
+
+
+# Keep subprocess candidate files in RAM where a tmpfs is available (Linux);
+# None leaves tempfile on its default directory
+_TMPDIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    """Kill a candidate started by _run_file along with anything it spawned"""
+    if hasattr(os, "killpg"):
+        try:
+            # The candidate leads its own session, so its pid is the group id
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        process.kill()
+
+
+def _read_capped(process: subprocess.Popen, stream, sink: Dict[str, bytes], key: str) -> None:
+    """Reader thread: read at most _MAX_OUT + 1 bytes, killing the process if it writes more"""
+    data = stream.read(_MAX_OUT + 1)
+    if len(data) > _MAX_OUT:
+        _kill_group(process)
+    sink[key] = data
+
+
+def _decode(data: bytes) -> str:
+    """Decode child output the way text=True would (locale encoding, universal newlines)"""
+    text = data.decode(locale.getpreferredencoding(False), errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _run_file(path: str, timeout: float) -> tuple:
+    """Run a candidate script in a fresh interpreter"""
+    # Same interpreter as ours rather than whatever `python` is on PATH;
+    # -I -S skip the environment, user site and site.py, -B skips .pyc writes
+    with subprocess.Popen(
+        [sys.executable, '-I', '-S', '-B', path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True
+    ) as process:
+        # Pipes are drained by capped readers so a flood of output is cut
+        # off at _MAX_OUT instead of being buffered in full
+        streams: Dict[str, bytes] = {}
+        readers = [
+            threading.Thread(target=_read_capped, args=(process, stream, streams, key), daemon=True)
+            for key, stream in (("stdout", process.stdout), ("stderr", process.stderr))
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            returncode = process.wait(timeout=timeout)
+        finally:
+            # On timeout, on SIGTERM to our worker (see _run_candidate) and
+            # after a normal exit alike: nothing the candidate left running survives
+            _kill_group(process)
+            for reader in readers:
+                reader.join(timeout=1)
+    
+    stdout = streams.get("stdout", b"")
+    stderr = streams.get("stderr", b"")
+    if len(stdout) > _MAX_OUT or len(stderr) > _MAX_OUT:
+        raise _OutputLimit(_decode(stdout[:_MAX_OUT]))
+    return _decode(stdout), _decode(stderr), returncode
+
+
+def _run_subprocess(code: str, timeout: float) -> tuple:
+    """Run candidate code in a fresh interpreter from a temporary file"""
+    try:
+        if sys.version_info >= (3, 12):
+            # The child reopens the file by name; it is removed on context exit
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', dir=_TMPDIR,
+                                             delete_on_close=False) as f:
+                f.write(code)
+                f.flush()
+                return _run_file(f.name, timeout)
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', dir=_TMPDIR, delete=False) as f:
+            f.write(code)
+        try:
+            return _run_file(f.name, timeout)
+        finally:
+            os.unlink(f.name)
+    
+    except subprocess.TimeoutExpired:
+        raise _CandidateTimeout()
+
+
+# generate_test_cases content never changes, so build it once, read-only
+_PRIME_TESTS = tuple(MappingProxyType(case) for case in [
+    {"input": 10, "expected": "contains 2, 3, 5, 7"},
+    {"input": 1, "expected": "handles edge case"},
+])
+_FIB_TESTS = tuple(MappingProxyType(case) for case in [
+    {"input": 5, "expected": "0, 1, 1, 2, 3"},
+    {"input": 1, "expected": "0 or [0]"},
+])
+_TESTS_BY_TAG = {"prime": _PRIME_TESTS, "fib": _FIB_TESTS}
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_goal(goal: str) -> tuple:
+    """Parse a goal once into (goal_lower, tag, target_n): tag is "prime",
+    "fib" or None, target_n the first number in the goal or None"""
+    goal_lower = goal.lower()
+    numbers = _UINTS.findall(goal_lower)
+    target_n = int(numbers[0]) if numbers else None
+    if "prime" in goal_lower:
+        tag = "prime"
+    elif "fibonacci" in goal_lower:
+        tag = "fib"
+    else:
+        tag = None
+    return goal_lower, tag, target_n
+
+
+def _extract_code(solution: str) -> Optional[str]:
+    """Extract Python code from the solution text"""
+    # Without any fence neither regex can match, so skip both scans
+    if "```" not in solution:
+        return _heuristic_extract(solution)
+    
+    # Look for code blocks
+    if "```python" in solution:
+        # Return the longest code block (likely the complete solution)
+        code = _longest_block(_FENCED_PY, solution)
+        if code is not None:
+            return code
+    
+    # Look for code block without python tag
+    code = _longest_block(_FENCED_ANY, solution)
+    
+    if code is not None:
+        # Check if it looks like Python code
+        if 'def ' in code or 'import ' in code or 'print' in code:
+            return code
+    
+    return _heuristic_extract(solution)
+
+
+def _longest_block(pattern: "re.Pattern", solution: str) -> Optional[str]:
+    """Longest group-1 match of pattern (first one on ties), sliced out only once"""
+    best = None
+    best_len = -1
+    for match in pattern.finditer(solution):
+        span = match.end(1) - match.start(1)
+        if span > best_len:
+            best_len = span
+            best = match
+    return best.group(1) if best else None
+
+
+def _heuristic_extract(solution: str) -> Optional[str]:
+    """Extract code from unfenced text by looking for function definitions"""
+    lines = solution.splitlines()
+    code_lines = []
+    in_code = False
+    
+    for line in lines:
+        stripped = line.strip()
+        # Start collecting when we see imports or function definitions
+        if stripped.startswith(_CODE_STARTS):
+            in_code = True
+        
+        if in_code:
+            # Stop if we hit natural language again
+            if stripped and not stripped.startswith(_PROSE_STARTS):
+                if not stripped.endswith(':'):
+                    break
+            code_lines.append(line)
+    
+    if code_lines:
+        return '\n'.join(code_lines)
+    
+    return None
+
+
+def _scan_entry_points(code: str) -> Optional[tuple]:
+    """Parse code once into (has_main, top-level function names), where
+    has_main means an `if __name__ ...` guard or any print() call.
+    Returns None if the code doesn't parse."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    
+    functions = [node.name for node in tree.body if isinstance(node, ast.FunctionDef)]
+    has_main = any(
+        isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+        and any(isinstance(side, ast.Name) and side.id == "__name__"
+                for side in [node.test.left, *node.test.comparators])
+        for node in tree.body
+    ) or any(
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "print"
+        for node in ast.walk(tree)
+    )
+    return has_main, functions
+
+
+def _add_main_block(code: str, goal: str) -> str:
+    """Append an entry point calling the likely main function if the code has none"""
+    # Check if code already has a main execution block, and look for
+    # functions that might be the main entry point
+    scanned = _scan_entry_points(code)
+    if scanned is None:
+        # Not parseable; fall back to plain text checks
+        has_main = "__main__" in code or "print(" in code
+        functions = _FUNC_DEF.findall(code)
+    else:
+        has_main, functions = scanned
+    
+    if not has_main:
+        # Try to identify the main function based on the goal
+        _, tag, target_n = _parse_goal(goal)
+        
+        main_func = None
+        if functions:
+            # Priority: look for functions with relevant names
+            for func in functions:
+                func_lower = func.lower()
+                if any(keyword in func_lower for keyword in _MAIN_KEYWORDS):
+                    main_func = func
+                    break
+            
+            # If no relevant function found, use the last defined function
+            if not main_func and functions:
+                main_func = functions[-1]
+        
+        # Add appropriate main block based on the goal
+        if main_func:
+            if tag == "prime" and target_n:
+                # Pass the requested count, e.g. "first 40 primes" -> 40
+                code += f"\n\nif __name__ == '__main__':\n    result = {main_func}({target_n})\n    print(result)"
+            else:
+                # Generic execution
+                code += f"\n\nif __name__ == '__main__':\n    result = {main_func}()\n    print(result)"
+    
+    return code
+
+
+def _new_result() -> Dict[str, Any]:
+    """Blank test result as returned by test_solution"""
+    return {
+        "success": False,
+        "output": None,
+        "error": None,
+        "issues": [],
+        "execution_time": None
+    }
+
+
+def _mark_not_run(result: Dict[str, Any], reason: str) -> None:
+    """Fill result for a proposal test_solutions never got to run"""
+    result["error"] = f"Not tested: {reason}"
+    result["issues"].append("Solution was not run")
+
+
+def _timed(runner: Callable[[str, float], tuple], code: str, timeout: float) -> tuple:
+    """Call runner(code, timeout) and append the seconds it took to its
+    (stdout, stderr, returncode)"""
+    start = time.perf_counter()
+    stdout, stderr, returncode = runner(code, timeout)
+    return stdout, stderr, returncode, time.perf_counter() - start
+
+
+def _stop_worker(signum, frame):
+    """SIGTERM handler for test_solutions workers: unwind so finally blocks run"""
+    raise SystemExit(128 + signum)
+
+
+def _run_candidate(index: int, solution: str, goal: str, timeout: float) -> Optional[tuple]:
+    """Pool task for Engineer.test_solutions: extract, shim and run proposal index.
+    Returns (stdout, stderr, returncode, seconds), or None if the solution has no code."""
+    if _started is not None:
+        _started[index] = 1
+    code = _extract_code(solution)
+    if not code:
+        return None
+    code = _add_main_block(code, goal)
+    
+    # The candidate gets its own interpreter, which _run_file kills at the
+    # timeout, so this worker never hangs however the candidate behaves and
+    # a crash takes down only the candidate. A terminated worker (pool
+    # teardown) unwinds through _run_file, which kills the candidate's
+    # process group and removes its file instead of orphaning them.
+    previous = signal.signal(signal.SIGTERM, _stop_worker)
+    try:
+        return _timed(_run_subprocess, code, timeout)
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
 class Engineer:
     """Tests and validates proposed solutions"""
     
     def __init__(self):
-        self.test_results = []
+        # Recorded test results, stored column-wise; see results_view()
+        self._success = array('b')
+        self._elapsed = array('d')
+        self._outputs: List[Optional[str]] = []
+        self._errors: List[Optional[str]] = []
+        self._issues: List[List[str]] = []
+        # Recorded cache hits; their 0.0 execution times stay out of mean_time()
+        self._cache_hits = 0
+        # blake2b(goal, code) -> successful result, least recently used first
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
         
     def extract_code(self, solution: str) -> Optional[str]:
         """Extract Python code from the solution text"""
-        # Look for code blocks
-        code_pattern = r'```python\n(.*?)```'
-        matches = re.findall(code_pattern, solution, re.DOTALL)
-        
-        if matches:
-            # Return the longest code block (likely the complete solution)
-            return max(matches, key=len)
-        
-        # Look for code block without python tag
-        code_pattern2 = r'```\n(.*?)```'
-        matches = re.findall(code_pattern2, solution, re.DOTALL)
-        
-        if matches:
-            code = max(matches, key=len)
-            # Check if it looks like Python code
-            if 'def ' in code or 'import ' in code or 'print' in code:
-                return code
-        
-        # Try to extract code by looking for function definitions
-        lines = solution.split('\n')
-        code_lines = []
-        in_code = False
-        
-        for line in lines:
-            # Start collecting when we see imports or function definitions
-            if line.strip().startswith(('import ', 'from ', 'def ', 'class ')):
-                in_code = True
-            
-            if in_code:
-                # Stop if we hit natural language again
-                if line.strip() and not any(line.strip().startswith(x) for x in 
-                    ['#', 'import', 'from', 'def', 'class', 'if', 'for', 'while', 
-                     'return', 'print', 'try', 'except', ' ', '\t']):
-                    if not line.strip().endswith(':'):
-                        break
-                code_lines.append(line)
-        
-        if code_lines:
-            return '\n'.join(code_lines)
-        
-        return None
+        return _extract_code(solution)
     
     def test_solution(self, proposal: Dict[str, Any]) -> Dict[str, Any]:
         """Test the proposed solution"""
         logger.info(f"Testing solution for: {proposal['goal']}")
         
-        result = {
-            "success": False,
-            "output": None,
-            "error": None,
-            "issues": [],
-            "execution_time": None
-        }
+        result = _new_result()
         
         # Extract code from solution
         code = self.extract_code(proposal['solution'])
@@ -78,84 +598,198 @@ class Engineer:
             result["issues"].append("Solution must include Python code")
             return result
         
-        # Check if code already has a main execution block
-        has_main = "__main__" in code or "print(" in code
+        # LLMs often regenerate identical code; reuse a known-good run
+        key = hashlib.blake2b(
+            proposal['goal'].encode() + b"\0" + code.encode(), digest_size=16
+        ).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            logger.info("Solution already passed; reusing cached result")
+            result = copy.deepcopy(cached)
+            result["execution_time"] = 0.0
+            self._cache_hits += 1
+            self._record(result)
+            return result
         
-        if not has_main:
-            # Try to identify the main function based on the goal
-            goal_lower = proposal['goal'].lower()
-            
-            # Look for functions that might be the main entry point
-            function_pattern = r'def\s+(\w+)\s*\([^)]*\):'
-            functions = re.findall(function_pattern, code)
-            
-            main_func = None
-            if functions:
-                # Priority: look for functions with relevant names
-                for func in functions:
-                    if any(keyword in func.lower() for keyword in ['main', 'find', 'get', 'calculate', 'solve']):
-                        main_func = func
-                        break
-                
-                # If no relevant function found, use the last defined function
-                if not main_func and functions:
-                    main_func = functions[-1]
-            
-            # Add appropriate main block based on the goal
-            if main_func:
-                if "prime" in goal_lower and "40" in goal_lower:
-                    code += f"\n\nif __name__ == '__main__':\n    result = {main_func}(40)\n    print(result)"
-                elif "prime" in goal_lower and any(str(i) in goal_lower for i in range(1, 100)):
-                    # Extract number from goal (use module-level `re`)
-                    numbers = re.findall(r'\d+', goal_lower)
-                    if numbers:
-                        n = numbers[0]
-                        code += f"\n\nif __name__ == '__main__':\n    result = {main_func}({n})\n    print(result)"
-                else:
-                    # Generic execution
-                    code += f"\n\nif __name__ == '__main__':\n    result = {main_func}()\n    print(result)"
+        code = _add_main_block(code, proposal['goal'])
+        logger.debug(f"Testing code:\n{code}")
+        
+        self._collect(result, lambda: self._execute(code))
+        self._record(result)
+        
+        if result["success"]:
+            self._cache[key] = copy.deepcopy(result)
+            if len(self._cache) > _CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+    
+    def test_solutions(self, proposals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Test several proposals in parallel; results come back in proposal order"""
+        logger.info(f"Testing {len(proposals)} solutions in parallel")
+        results = [_new_result() for _ in proposals]
+        if not proposals:
+            return results
+        
+        workers = min(os.cpu_count() or 1, len(proposals))
+        started = _new_flags(len(proposals))
+        ran = [False] * len(proposals)
+        # (proposal indices, pool width) still to run. A worker going down
+        # breaks its whole pool: proposals that hadn't started are simply
+        # run again, and if several were running at the time they are rerun
+        # one at a time so only the one that crashes is reported as broken.
+        rounds = [(list(range(len(proposals))), workers)]
+        while rounds:
+            indices, width = rounds.pop()
+            broken, unstarted = self._run_round(proposals, indices, width, started, results, ran)
+            if len(broken) == 1:
+                (i, future), = broken.items()
+                ran[i] = self._collect(results[i], future.result)
+            elif broken:
+                rounds.append((list(broken), 1))
+            if len(unstarted) == len(indices):
+                # The pool broke before anything ran; don't retry forever
+                for i in unstarted:
+                    _mark_not_run(results[i], "worker pool failed to start")
+            elif unstarted:
+                rounds.append((unstarted, min(workers, len(unstarted))))
         
-        # Test the code in a temporary file
+        # Record in proposal order, not completion order, so the column
+        # store lines up with the returned list
+        for result, has_run in zip(results, ran):
+            if has_run:
+                self._record(result)
+        return results
+    
+    def _run_round(self, proposals: List[Dict[str, Any]], indices: List[int], width: int,
+                   started, results: List[Dict[str, Any]], ran: List[bool]) -> tuple:
+        """Run proposals[i] for i in indices on a fresh pool of width workers,
+        filling results/ran. Returns ({i: future} for proposals that were running
+        when the pool broke, [i] for those that never started)."""
+        # Every candidate is killed at its own timeout; this deadline is only
+        # a backstop, allowing for proposals queued behind others
+        deadline = _EXEC_TIMEOUT * math.ceil(len(indices) / width) + 5
+        broken: Dict[int, Any] = {}
+        unstarted: List[int] = []
+        for i in indices:
+            started[i] = 0
+        executor = _new_pool(width, started)
+        timed_out = False
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            logger.debug(f"Testing code:\n{code}")
-            
-            # Run the code with a timeout
-            process = subprocess.run(
-                ['python', temp_file],
-                capture_output=True,
-                text=True,
-                timeout=30  # 30 second timeout
-            )
+            futures = {
+                executor.submit(_run_candidate, i, proposals[i]['solution'],
+                                proposals[i]['goal'], _EXEC_TIMEOUT): i
+                for i in indices
+            }
+            try:
+                for future in as_completed(futures, timeout=deadline):
+                    i = futures[future]
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        if started[i]:
+                            broken[i] = future
+                        else:
+                            unstarted.append(i)
+                        continue
+                    ran[i] = self._collect(results[i], future.result)
+            except FuturesTimeoutError:
+                timed_out = True
+                for future, i in futures.items():
+                    if future.done():
+                        continue
+                    if started[i]:
+                        ran[i] = self._collect(results[i], _raise_timeout)
+                    else:
+                        _mark_not_run(results[i], f"batch deadline ({deadline} seconds) reached")
+        finally:
+            if timed_out:
+                _terminate_workers(executor)
+            executor.shutdown(wait=not timed_out, cancel_futures=True)
+        return broken, unstarted
+    
+    def _execute(self, code: str) -> tuple:
+        """Run prepared candidate code; returns (stdout, stderr, returncode, seconds)"""
+        # Candidate code never runs in this process: a pool worker (or, for
+        # denylisted imports, a fresh interpreter) can always be killed
+        if _DENIED_IMPORT.search(code):
+            return _timed(_run_subprocess, code, _EXEC_TIMEOUT)
+        return _timed(_run_pooled, code, _EXEC_TIMEOUT)
+    
+    def _collect(self, result: Dict[str, Any], run: Callable[[], Optional[tuple]]) -> bool:
+        """Fill result from run(), which returns (stdout, stderr, returncode, seconds),
+        or None when the solution had no code. Returns whether anything ran, i.e.
+        whether the caller should _record the result."""
+        start = time.perf_counter()
+        try:
+            outcome = run()
+            if outcome is None:
+                result["error"] = "No executable code found in solution"
+                result["issues"].append("Solution must include Python code")
+                return False
+            stdout, stderr, returncode, result["execution_time"] = outcome
             
-            if process.returncode == 0:
+            if returncode == 0:
                 result["success"] = True
-                result["output"] = process.stdout
+                result["output"] = stdout
                 logger.info("Solution executed successfully")
             else:
-                result["error"] = process.stderr
+                result["error"] = stderr
                 result["issues"].append("Code execution failed")
-                logger.error(f"Execution error: {process.stderr}")
+                logger.error(f"Execution error: {stderr}")
                 
-        except subprocess.TimeoutExpired:
-            result["error"] = "Code execution timed out (30 seconds)"
+        except _CandidateTimeout:
+            result["execution_time"] = float(_EXEC_TIMEOUT)
+            result["error"] = f"Code execution timed out ({_EXEC_TIMEOUT} seconds)"
             result["issues"].append("Solution may have infinite loop or be too slow")
             
+        except _OutputLimit as e:
+            result["execution_time"] = time.perf_counter() - start
+            result["output"] = e.args[0]
+            result["error"] = f"Output exceeded {_MAX_OUT} bytes; candidate was stopped"
+            result["issues"].append(f"Output truncated at {_MAX_OUT} bytes")
+            logger.error(f"Execution error: output exceeded {_MAX_OUT} bytes")
+            
+        except BrokenProcessPool:
+            result["execution_time"] = time.perf_counter() - start
+            result["error"] = "Worker process exited unexpectedly"
+            result["issues"].append("Code execution failed")
+            logger.error("Execution error: worker process exited unexpectedly")
+            
         except Exception as e:
+            result["execution_time"] = time.perf_counter() - start
             result["error"] = str(e)
             result["issues"].append(f"Unexpected error: {type(e).__name__}")
             logger.error(f"Unexpected error: {e}")
-            
-        finally:
-            # Clean up temp file
-            if 'temp_file' in locals() and os.path.exists(temp_file):
-                os.unlink(temp_file)
         
-        self.test_results.append(result)
-        return result
+        return True
+    
+    def _record(self, result: Dict[str, Any]) -> None:
+        """Append a finished result to the column-wise store"""
+        self._success.append(result["success"])
+        self._elapsed.append(result["execution_time"])
+        self._outputs.append(result["output"])
+        self._errors.append(result["error"])
+        # Copied so later edits to the caller's result don't rewrite history
+        self._issues.append(list(result["issues"]))
+    
+    def results_view(self, i: int) -> Dict[str, Any]:
+        """Rebuild the i-th recorded test result as a dict"""
+        return {
+            "success": bool(self._success[i]),
+            "output": self._outputs[i],
+            "error": self._errors[i],
+            "issues": list(self._issues[i]),
+            "execution_time": self._elapsed[i]
+        }
+    
+    def mean_time(self) -> float:
+        """Mean execution time in seconds over recorded tests that actually ran
+        (cache hits excluded)"""
+        runs = len(self._elapsed) - self._cache_hits
+        return math.fsum(self._elapsed) / runs if runs else 0.0
+    
+    def success_rate(self) -> float:
+        """Fraction of recorded tests that executed successfully"""
+        return sum(self._success) / len(self._success) if self._success else 0.0
     
     def validate_output(self, output: str, goal: str) -> Dict[str, Any]:
         """Validate if the output meets the goal requirements"""
@@ -170,21 +804,36 @@ class Engineer:
             return validation
         
         # Basic validation based on goal keywords
-        goal_lower = goal.lower()
+        goal_lower, tag, target_n = _parse_goal(goal)
         
-        if "prime" in goal_lower and ("first" in goal_lower or "40" in goal_lower):
+        if tag == "prime" and ("first" in goal_lower or "40" in goal_lower):
             # Check if output contains numbers
-            numbers = re.findall(r'\d+', output)
+            numbers = _scan_ints(output)
             if numbers:
                 validation["notes"].append(f"Found {len(numbers)} numbers in output")
                 
+                # Exact check against the real first N primes, compared as
+                # decimal tokens so no number needs an int() conversion; the
+                # length test first keeps us from sieving for a mismatched output
+                exact = False
+                if target_n and len(numbers) == target_n:
+                    if target_n <= len(_PRIME_TOKENS):
+                        expected = _PRIME_TOKENS[:target_n]
+                    else:
+                        expected = [str(p).encode() for p in _first_n_primes(target_n)]
+                    exact = numbers == expected
+                
+                if exact:
+                    validation["meets_goal"] = True
+                    validation["confidence"] = 1.0
+                    validation["notes"].append(f"Output matches the first {target_n} primes exactly")
+                
                 # Check if we have around 40 numbers
-                if 35 <= len(numbers) <= 45:
+                elif 35 <= len(numbers) <= 45:
                     # Basic prime check for first few
-                    first_primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
-                    output_numbers = [int(n) for n in numbers[:10]]
+                    output_numbers = {int(n) for n in numbers[:10]}
                     
-                    if all(p in output_numbers for p in first_primes[:5]):
+                    if _FIRST_5_PRIMES <= output_numbers:
                         validation["meets_goal"] = True
                         validation["confidence"] = 0.9
                         validation["notes"].append("Output contains correct prime numbers")
@@ -192,15 +841,15 @@ class Engineer:
                         validation["confidence"] = 0.3
                         validation["notes"].append("Numbers found but may not all be primes")
                         
-        elif "fibonacci" in goal_lower:
-            numbers = re.findall(r'\d+', output)
+        elif tag == "fib":
+            numbers = _scan_ints(output, signed=False)
             if len(numbers) >= 5:
                 # Check if it follows Fibonacci pattern
                 validation["notes"].append(f"Found {len(numbers)} numbers")
                 try:
-                    nums = [int(n) for n in numbers[:10]]
+                    head = tuple(map(int, numbers[:5]))
                     # Check first few Fibonacci numbers
-                    if nums[:5] == [0, 1, 1, 2, 3] or nums[:5] == [1, 1, 2, 3, 5]:
+                    if head == _FIB5A or head == _FIB5B:
                         validation["meets_goal"] = True
                         validation["confidence"] = 0.9
                 except:
@@ -215,19 +864,6 @@ class Engineer:
         
         return validation
     
-    def generate_test_cases(self, goal: str) -> list:
-        """Generate test cases based on the goal"""
-        test_cases = []
-        
-        if "prime" in goal.lower():
-            test_cases = [
-                {"input": 10, "expected": "contains 2, 3, 5, 7"},
-                {"input": 1, "expected": "handles edge case"},
-            ]
-        elif "fibonacci" in goal.lower():
-            test_cases = [
-                {"input": 5, "expected": "0, 1, 1, 2, 3"},
-                {"input": 1, "expected": "0 or [0]"},
-            ]
-            
-        return test_cases
\ No newline at end of file
+    def generate_test_cases(self, goal: str) -> tuple:
+        """Generate test cases based on the goal (shared read-only mappings)"""
+        return _TESTS_BY_TAG.get(_parse_goal(goal)[1], ())